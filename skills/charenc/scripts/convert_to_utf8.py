@@ -1,19 +1,90 @@
 #!/usr/bin/env python3
 """Convert file to UTF-8 and save original encoding metadata."""
 
+import os
 import sys
+import stat
 import json
+import codecs
 import hashlib
+import functools
 import argparse
-import shutil
+import time
 from pathlib import Path
-from datetime import datetime
+
+CHUNK_SIZE = 1024 * 1024
+
+# Metadata directories already created by this process
+_known_dirs = set()
+
+
+@functools.lru_cache(maxsize=8)
+def _decoder_factory(encoding: str):
+    """Return the incremental decoder class for an encoding (cached per name)."""
+    return codecs.getincrementaldecoder(encoding)
+
+
+@functools.lru_cache(maxsize=8)
+def _is_ascii_compatible(encoding: str) -> bool:
+    """Check whether ASCII bytes always decode to themselves in an encoding.
+
+    Rejects UTF-16/32 and shift-based encodings (ISO-2022, HZ, UTF-7),
+    where plain ASCII bytes can change meaning.
+    """
+    probes = [bytes(range(128)), b'\x1b$B\x1b(B', b'~{~}', b'+AGE-']
+    try:
+        return all(p.decode(encoding) == p.decode('ascii') for p in probes)
+    except (UnicodeDecodeError, LookupError):
+        return False
+
+
+def _ensure_dir(path: Path) -> None:
+    """Create a directory, skipping the syscalls if this process already did."""
+    key = str(path)
+    if key not in _known_dirs:
+        path.mkdir(parents=True, exist_ok=True)
+        _known_dirs.add(key)
+
+
+def _absolute_path(file_path: str) -> Path:
+    """Make a path absolute without resolving every parent directory.
+
+    Only a symlink in the final component is followed, so the file is
+    replaced at its target rather than the link being overwritten.
+    """
+    path = os.path.abspath(file_path)
+    if os.path.islink(path):
+        path = os.path.realpath(path)
+    return Path(path)
+
+
+def _open_for_read(path: Path):
+    """Open a file for unbuffered binary reading without updating its atime."""
+    flags = os.O_RDONLY | getattr(os, 'O_BINARY', 0)
+    noatime = getattr(os, 'O_NOATIME', 0)
+    try:
+        fd = os.open(path, flags | noatime)
+    except PermissionError:
+        if not noatime:
+            raise
+        # O_NOATIME is only allowed for the file's owner
+        fd = os.open(path, flags)
+    return open(fd, 'rb', buffering=0)
+
+
+def _remove_quietly(path: Path) -> None:
+    """Remove a file, ignoring errors (used to discard temporary output)."""
+    try:
+        path.unlink()
+    except OSError:
+        pass
 
 
 def convert_to_utf8(
     file_path: str,
     encoding: str,
-    backup: bool = True
+    backup: bool = True,
+    force: bool = False
 ) -> dict:
     """Convert file to UTF-8.
 
@@ -21,52 +92,134 @@ def convert_to_utf8(
         file_path: Path to the file to convert
         encoding: Source encoding (e.g., 'cp932', 'shift_jis', 'euc-jp')
         backup: Create backup file
+        force: Convert even if the file still matches its last conversion
 
     Returns:
         dict with conversion result
     """
-    path = Path(file_path).resolve()
+    path = _absolute_path(file_path)
 
     if not path.exists():
         return {"status": "error", "error": f"File not found: {file_path}"}
 
-    # Read original content
+    # Metadata left by an earlier conversion (e.g. restore --keep-backup)
+    meta_dir = path.parent / ".charenc_meta"
+    meta_path = meta_dir / f"{path.name}.json"
+    previous_hash = None
+    if not force and meta_path.exists():
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                previous_hash = json.load(f).get("converted_hash")
+        except (json.JSONDecodeError, IOError, AttributeError):
+            pass
+
     try:
-        with open(path, 'rb') as f:
-            original_bytes = f.read()
+        decoder = _decoder_factory(encoding)()
+        ascii_compatible = _is_ascii_compatible(encoding)
+    except LookupError:
+        return {"status": "error", "error": f"Unknown encoding: {encoding}"}
+
+    try:
+        src = _open_for_read(path)
     except IOError as e:
         return {"status": "error", "error": f"Cannot read file: {e}"}
 
-    # Decode with specified encoding
+    # Decode/encode in chunks into a temporary file next to the original,
+    # hashing both sides as we go (the original is not touched yet)
+    tmp_path = path.with_name(f"{path.name}.charenc.tmp")
+    original_sha256 = hashlib.sha256()
+    converted_sha256 = hashlib.sha256()
+    offset = 0
+    try:
+        # Exclusive create: a second conversion of the same file fails here,
+        # before it touches the temp file, backup or metadata of the first
+        dst = open(tmp_path, 'xb')
+    except FileExistsError:
+        src.close()
+        return {
+            "status": "error",
+            "error": f"Temporary file already exists: {tmp_path}",
+            "hint": "Another conversion of this file may be running; otherwise remove the leftover file."
+        }
+    except OSError as e:
+        src.close()
+        return {"status": "error", "error": f"Conversion failed: {e}"}
+
     try:
-        text = original_bytes.decode(encoding)
+        with src, dst:
+            while True:
+                chunk = src.read(CHUNK_SIZE)
+                final = not chunk
+                if (ascii_compatible and decoder.getstate() == (b'', 0)
+                        and chunk.isascii()):
+                    # Pure ASCII with no pending multibyte state: already UTF-8
+                    utf8_chunk = chunk
+                else:
+                    utf8_chunk = decoder.decode(chunk, final=final).encode('utf-8')
+                original_sha256.update(chunk)
+                converted_sha256.update(utf8_chunk)
+                dst.write(utf8_chunk)
+                if final:
+                    break
+                offset += len(chunk)
+            dst.flush()
+            os.fsync(dst.fileno())
+        os.chmod(tmp_path, stat.S_IMODE(path.stat().st_mode))
     except UnicodeDecodeError as e:
+        _remove_quietly(tmp_path)
         return {
             "status": "error",
-            "error": f"Decode error with {encoding}: {e}"
+            "error": f"Decode error with {encoding} near byte {offset + e.start}: {e.reason}"
         }
-    except LookupError:
-        return {"status": "error", "error": f"Unknown encoding: {encoding}"}
+    except (IOError, OSError) as e:
+        _remove_quietly(tmp_path)
+        return {"status": "error", "error": f"Conversion failed: {e}"}
+
+    original_hash = original_sha256.hexdigest()
+    converted_hash = converted_sha256.hexdigest()
 
-    # Create backup
+    # Refuse to convert a file that is still the output of its last
+    # conversion: that would double-encode it and replace its backup
+    if previous_hash is not None and original_hash == previous_hash:
+        _remove_quietly(tmp_path)
+        return {
+            "status": "error",
+            "error": f"Already converted (content matches {meta_path})",
+            "hint": "Restore the file with restore_encoding.py, or use --force to convert it again."
+        }
+
+    # Files this call newly created are removed again if a later step fails;
+    # pre-existing files it overwrote are left alone
+    created = [tmp_path]
+
+    # Create backup. The original is replaced by rename below, so a hard link
+    # keeps the untouched original inode without copying any data.
     backup_path = None
     if backup:
         backup_path = path.parent / f"{path.name}.{encoding}.bak"
         try:
-            shutil.copy2(path, backup_path)
-        except (IOError, OSError) as e:
-            return {"status": "error", "error": f"Backup failed: {e}"}
-
-    # Prepare UTF-8 bytes and calculate hashes in memory (before any file modification)
-    utf8_bytes = text.encode('utf-8')
-    original_hash = hashlib.sha256(original_bytes).hexdigest()
-    converted_hash = hashlib.sha256(utf8_bytes).hexdigest()
+            try:
+                os.link(path, backup_path)
+            except FileExistsError:
+                if not os.path.samefile(path, backup_path):
+                    raise
+                # Stale link to the live file left by an earlier failed run
+                backup_path.unlink()
+                os.link(path, backup_path)
+            created.append(backup_path)
+        except OSError:
+            # Cross-device, unsupported filesystem, or stale backup exists
+            backup_existed = os.path.lexists(backup_path)
+            try:
+                import shutil
+                shutil.copy2(path, backup_path)
+            except (IOError, OSError) as e:
+                _remove_quietly(tmp_path)
+                return {"status": "error", "error": f"Backup failed: {e}"}
+            if not backup_existed:
+                created.append(backup_path)
 
-    # Create metadata directory
-    meta_dir = path.parent / ".charenc_meta"
-    meta_dir.mkdir(parents=True, exist_ok=True)
-
-    # Save metadata first (before writing file to avoid orphaned conversions)
+    # Save metadata first (before replacing file to avoid orphaned conversions)
     metadata = {
         "schema": "charenc-simple",
         "original_file": str(path),
@@ -74,20 +227,32 @@ def convert_to_utf8(
         "original_hash": original_hash,
         "converted_hash": converted_hash,
         "backup_path": str(backup_path) if backup_path else None,
-        "converted_at": datetime.now().isoformat()
+        "converted_at": time.strftime("%Y-%m-%dT%H:%M:%S")
     }
-    meta_path = meta_dir / f"{path.name}.json"
+    meta_bytes = json.dumps(metadata, ensure_ascii=False, indent=2).encode('utf-8')
+    meta_existed = os.path.lexists(meta_path)
     try:
-        with open(meta_path, 'w', encoding='utf-8') as f:
-            json.dump(metadata, f, ensure_ascii=False, indent=2)
+        _ensure_dir(meta_dir)
+        try:
+            meta_path.write_bytes(meta_bytes)
+        except FileNotFoundError:
+            # Directory was removed (e.g. by a restore) after it was cached
+            _known_dirs.discard(str(meta_dir))
+            _ensure_dir(meta_dir)
+            meta_path.write_bytes(meta_bytes)
     except (IOError, OSError) as e:
+        for created_path in created:
+            _remove_quietly(created_path)
         return {"status": "error", "error": f"Metadata write failed: {e}"}
+    if not meta_existed:
+        created.append(meta_path)
 
-    # Write UTF-8 file last (after metadata is saved successfully)
+    # Swap in the UTF-8 file last (atomic rename within the same directory)
     try:
-        with open(path, 'wb') as f:
-            f.write(utf8_bytes)
-    except IOError as e:
+        os.replace(tmp_path, path)
+    except OSError as e:
+        for created_path in created:
+            _remove_quietly(created_path)
         return {"status": "error", "error": f"Cannot write file: {e}"}
 
     return {
@@ -99,11 +264,60 @@ def convert_to_utf8(
     }
 
 
+def convert_many(
+    files: list,
+    encoding: str,
+    backup: bool = True,
+    workers: int = None,
+    force: bool = False
+) -> list:
+    """Convert several files to UTF-8 concurrently.
+
+    Args:
+        files: Paths of the files to convert
+        encoding: Source encoding shared by all files
+        backup: Create backup files
+        workers: Number of worker threads (default: based on CPU count)
+        force: Convert even files that still match their last conversion
+
+    Returns:
+        list of conversion results, in the same order as files (a file listed
+        more than once, under any path or hard link, is converted once and
+        shares the result)
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    def file_key(f):
+        try:
+            st = os.stat(f)
+            return (st.st_dev, st.st_ino)
+        except OSError:
+            return os.path.realpath(f)
+
+    # Converting the same file in two workers would race on its temp file,
+    # backup and metadata, so each distinct file is converted only once
+    keys = [file_key(f) for f in files]
+    unique = {}
+    for key, f in zip(keys, files):
+        unique.setdefault(key, f)
+
+    if workers is None:
+        workers = min(32, (os.cpu_count() or 4) * 4)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = dict(zip(unique, executor.map(
+            lambda f: convert_to_utf8(
+                f, encoding=encoding, backup=backup, force=force
+            ),
+            unique.values()
+        )))
+    return [results[key] for key in keys]
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Convert file to UTF-8 for editing with Claude Code"
     )
-    parser.add_argument("file", help="File to convert")
+    parser.add_argument("file", nargs="?", help="File to convert")
     parser.add_argument(
         "--encoding", "-e",
         required=True,
@@ -114,13 +328,44 @@ def main():
         action="store_true",
         help="Skip backup creation"
     )
+    parser.add_argument(
+        "--batch",
+        metavar="FILELIST",
+        help="Convert every file listed in FILELIST (one path per line)"
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Convert even if the file is unchanged since its last conversion"
+    )
 
     args = parser.parse_args()
 
+    if (args.file is None) == (args.batch is None):
+        parser.error("specify either a file or --batch FILELIST")
+
+    if args.batch:
+        try:
+            with open(args.batch, 'r', encoding='utf-8') as f:
+                files = [line.strip() for line in f if line.strip()]
+        except (IOError, UnicodeDecodeError) as e:
+            parser.error(f"cannot read file list: {e}")
+        results = convert_many(
+            files,
+            encoding=args.encoding,
+            backup=not args.no_backup,
+            force=args.force
+        )
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        if any(r["status"] != "success" for r in results):
+            sys.exit(1)
+        return
+
     result = convert_to_utf8(
         args.file,
         encoding=args.encoding,
-        backup=not args.no_backup
+        backup=not args.no_backup,
+        force=args.force
     )
 
     # Output result as JSON
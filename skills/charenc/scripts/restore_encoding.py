@@ -1,20 +1,54 @@
 #!/usr/bin/env python3
 """Restore file to original encoding from UTF-8."""
 
+import os
 import sys
+import stat
 import json
+import mmap
+import codecs
 import hashlib
 import argparse
 from pathlib import Path
 
+CHUNK_SIZE = 1024 * 1024
 
-def get_file_hash(file_path: Path) -> str:
-    """Calculate SHA256 hash of file."""
-    sha256 = hashlib.sha256()
-    with open(file_path, 'rb') as f:
-        for chunk in iter(lambda: f.read(8192), b''):
-            sha256.update(chunk)
-    return sha256.hexdigest()
+# Files at least this large are mapped instead of read into memory
+MMAP_THRESHOLD = 16 * 1024 * 1024
+
+
+def _absolute_path(file_path: str) -> Path:
+    """Make a path absolute without resolving every parent directory.
+
+    Only a symlink in the final component is followed, so the file is
+    replaced at its target rather than the link being overwritten.
+    """
+    path = os.path.abspath(file_path)
+    if os.path.islink(path):
+        path = os.path.realpath(path)
+    return Path(path)
+
+
+def _open_for_read(path: Path):
+    """Open a file for unbuffered binary reading without updating its atime."""
+    flags = os.O_RDONLY | getattr(os, 'O_BINARY', 0)
+    noatime = getattr(os, 'O_NOATIME', 0)
+    try:
+        fd = os.open(path, flags | noatime)
+    except PermissionError:
+        if not noatime:
+            raise
+        # O_NOATIME is only allowed for the file's owner
+        fd = os.open(path, flags)
+    return open(fd, 'rb', buffering=0)
+
+
+def _remove_quietly(path: Path) -> None:
+    """Remove a file, ignoring errors (used to discard temporary output)."""
+    try:
+        path.unlink()
+    except OSError:
+        pass
 
 
 def restore_encoding(
@@ -32,7 +66,7 @@ def restore_encoding(
     Returns:
         dict with restoration result
     """
-    path = Path(file_path).resolve()
+    path = _absolute_path(file_path)
 
     if not path.exists():
         return {"status": "error", "error": f"File not found: {file_path}"}
@@ -70,51 +104,72 @@ def restore_encoding(
             "error": f"Invalid metadata: missing required keys: {', '.join(missing_keys)}"
         }
 
-    # Verify file hash
-    hash_warning = None
-    expected_hash = None
-    current_hash = None
+    # Get encoding from metadata
+    target_encoding = metadata["original_encoding"]
+
+    # Read the file once: the same buffer is hashed and decoded. Large files
+    # are mapped so hashing scans the page cache without an extra copy.
     try:
-        current_hash = get_file_hash(path)
+        with _open_for_read(path) as f:
+            if os.fstat(f.fileno()).st_size >= MMAP_THRESHOLD:
+                content = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                content = f.read()
+    except (IOError, OSError) as e:
+        return {"status": "error", "error": f"Cannot read file: {e}"}
+
+    try:
+        # Verify file hash
+        hash_warning = None
         expected_hash = metadata['converted_hash']
+        current_hash = hashlib.sha256(content).hexdigest()
         if current_hash != expected_hash:
             hash_warning = "File was modified since conversion (hash mismatch)"
-    except IOError:
-        pass  # If hash calculation fails, continue without verification
-
-    # Get encoding from metadata
-    target_encoding = metadata["original_encoding"]
 
-    # Read UTF-8 content (preserve newlines as-is)
+        # Decode UTF-8 content (newlines are preserved as-is)
+        try:
+            text = str(content, 'utf-8')
+        except UnicodeDecodeError as e:
+            return {
+                "status": "error",
+                "error": f"Invalid UTF-8 content: {e}",
+                "hint": "The file is not valid UTF-8. It may be corrupted or not converted with convert_to_utf8.py."
+            }
+    finally:
+        if isinstance(content, mmap.mmap):
+            content.close()
+
+    # Convert to original encoding chunk by chunk, straight into a temporary
+    # file (the full encoded output is never held in memory), then
+    # atomically replace the original
     try:
-        with open(path, 'r', encoding='utf-8', newline='') as f:
-            text = f.read()
-    except UnicodeDecodeError as e:
-        return {
-            "status": "error",
-            "error": f"Invalid UTF-8 content: {e}",
-            "hint": "The file is not valid UTF-8. It may be corrupted or not converted with convert_to_utf8.py."
-        }
-    except IOError as e:
-        return {"status": "error", "error": f"Cannot read file: {e}"}
+        encoder = codecs.getincrementalencoder(target_encoding)(errors)
+    except LookupError:
+        return {"status": "error", "error": f"Unknown encoding: {target_encoding}"}
 
-    # Convert to original encoding
+    tmp_path = path.with_name(f"{path.name}.charenc.tmp")
+    offset = 0
     try:
-        encoded_bytes = text.encode(target_encoding, errors=errors)
+        with open(tmp_path, 'wb') as f:
+            for offset in range(0, len(text), CHUNK_SIZE):
+                f.write(encoder.encode(text[offset:offset + CHUNK_SIZE]))
+            f.write(encoder.encode('', final=True))
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, stat.S_IMODE(path.stat().st_mode))
+        os.replace(tmp_path, path)
     except UnicodeEncodeError as e:
+        _remove_quietly(tmp_path)
         return {
             "status": "error",
-            "error": f"Encode error with {target_encoding}: {e}",
+            "error": (
+                f"Encode error with {target_encoding}: cannot encode "
+                f"{e.object[e.start:e.end]!r} at position {offset + e.start}: {e.reason}"
+            ),
             "hint": "Try --errors replace or --errors backslashreplace"
         }
-    except LookupError:
-        return {"status": "error", "error": f"Unknown encoding: {target_encoding}"}
-
-    # Write output file
-    try:
-        with open(path, 'wb') as f:
-            f.write(encoded_bytes)
-    except IOError as e:
+    except (IOError, OSError) as e:
+        _remove_quietly(tmp_path)
         return {"status": "error", "error": f"Cannot write file: {e}"}
 
     # Cleanup
@@ -124,7 +179,7 @@ def restore_encoding(
     if cleanup and metadata:
         # Remove backup file (restrict to same directory as target file)
         if metadata.get("backup_path"):
-            backup_path = Path(metadata["backup_path"]).resolve()
+            backup_path = _absolute_path(metadata["backup_path"])
             if backup_path.parent == path.parent and backup_path.exists():
                 try:
                     backup_path.unlink()